@@ -5,7 +5,7 @@ Loads environment variables from .env file.
 
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -27,6 +27,13 @@ class Settings(BaseSettings):
 
     # Supabase/PostgreSQL Configuration
     DATABASE_URL: Optional[str] = None  # Required for Text-to-SQL
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
+
+    # Redis Configuration (optional - shared state across workers)
+    REDIS_URL: Optional[str] = None
+    PENDING_QUERY_TTL: int = 900  # Seconds before an unapproved SQL query expires
 
     # OPIK Monitoring
     OPIK_API_KEY: Optional[str] = None  # Optional for monitoring
@@ -41,6 +48,18 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 512
     MIN_CHUNK_SIZE: int = 256  # Minimum chunk size - smaller chunks will be merged
     CHUNK_OVERLAP: int = 50
+    PARSE_WORKERS: int = 0  # Parser processes for uploads (0 = one per CPU core)
+
+    # Embedding Configuration
+    EMBEDDING_BATCH_SIZE: int = 64  # Texts per embedding request during upload
+    EMBEDDING_MAX_CONCURRENCY: int = 16  # Concurrent embedding requests
+    EMBEDDING_DTYPE: Literal["float32", "float16"] = "float32"  # Local storage precision (float16 halves size)
+
+    # Semantic Cache Configuration (near-duplicate question caching)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Minimum cosine similarity for a cache hit
+    SEMANTIC_CACHE_TTL: int = 300  # Seconds
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000
 
     # Storage paths (defaults to /tmp for Lambda, can be overridden for local dev)
     UPLOAD_DIR: str = "/tmp/uploads"
@@ -3,17 +3,24 @@ Centralized logging configuration for the RAG application.
 Provides structured logging with rotation and multiple handlers.
 """
 
+import atexit
 import logging
 import os
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from queue import SimpleQueue
+
+# Handlers that actually write records (set by setup_logging, reused for worker processes)
+_log_handlers: list[logging.Handler] = []
 
 
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """
     Configure application-wide logging with console and file handlers.
     In Lambda environment, uses CloudWatch-compatible stdout logging only.
+    Locally, records go through a QueueHandler and are written by a background
+    QueueListener thread, so request handlers never block on stdout/file I/O.
 
     Args:
         log_level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -44,6 +51,7 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
         console_handler.setFormatter(formatter)
 
         logger.addHandler(console_handler)
+        _log_handlers.append(console_handler)
 
     else:
         # Local environment: Use console + file handlers
@@ -89,10 +97,20 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
         file_handler.setFormatter(detailed_formatter)
         error_handler.setFormatter(detailed_formatter)
 
-        # Add handlers to logger
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-        logger.addHandler(error_handler)
+        # Write from a background thread; the logger only enqueues records
+        log_queue = SimpleQueue()
+        listener = QueueListener(
+            log_queue,
+            console_handler,
+            file_handler,
+            error_handler,
+            respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)  # Flush queued records on shutdown
+
+        logger.addHandler(QueueHandler(log_queue))
+        _log_handlers.extend([console_handler, file_handler, error_handler])
 
     # Suppress overly verbose loggers from third-party libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -103,6 +121,40 @@ def setup_logging(log_level: str = "INFO") -> logging.Logger:
     return logger
 
 
+def create_worker_log_queue(mp_context):
+    """
+    Create a queue that worker processes log into.
+    A listener thread in this process drains it into the same handlers as the
+    main process, so worker records reach the console and log files.
+
+    Args:
+        mp_context: multiprocessing context the worker pool is created with
+
+    Returns:
+        multiprocessing.Queue to pass to configure_worker_logging()
+    """
+    log_queue = mp_context.Queue()
+    listener = QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return log_queue
+
+
+def configure_worker_logging(log_queue, log_level: int) -> None:
+    """
+    Route the application logger in a worker process to the parent's log queue.
+    Used as a process pool initializer.
+
+    Args:
+        log_queue: Queue returned by create_worker_log_queue()
+        log_level: Level of the parent's application logger
+    """
+    logger = logging.getLogger("rag_app")
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(log_level)
+
+
 def get_logger(name: str = "rag_app") -> logging.Logger:
     """
     Get a logger instance for a specific module.
@@ -4,22 +4,33 @@ FastAPI application with document RAG and natural language to SQL capabilities.
 """
 
 from typing import Optional
-from fastapi import FastAPI, status, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, status, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from datetime import datetime
 from pathlib import Path
+import os
 import sys
-import shutil
+import hashlib
+import orjson
+import asyncio
+import aiofiles
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import aclosing
+from functools import partial
 
 from app.config import settings
-from app.logging_config import setup_logging, get_logger
-from app.services.document_service import parse_document, chunk_text
-from app.services.embedding_service import EmbeddingService
+from app.logging_config import (
+    setup_logging, get_logger, create_worker_log_queue, configure_worker_logging
+)
+from app.services.document_service import parse_document, chunk_text, parse_and_chunk_with_context
+from app.services.embedding_service import EmbeddingService, CoalescingEmbedder
 from app.services.vector_service import VectorService
 from app.services.rag_service import RAGService
 from app.services.sql_service import TextToSQLService
 from app.services.router_service import QueryRouter
 from app.services.cache_service import CacheService
+from app.services.semantic_cache_service import SemanticCache
 from app.utils import (
     FileValidator, QueryValidator, ValidationError,
     ErrorResponse, format_file_size, truncate_text
@@ -51,15 +62,218 @@ app = FastAPI(
 
 # Global service instances (initialized on startup if API keys are available)
 embedding_service: EmbeddingService | None = None
+query_embedder: CoalescingEmbedder | None = None
 vector_service: VectorService | None = None
 rag_service: RAGService | None = None
 sql_service: TextToSQLService | None = None
 cache_service: CacheService | None = None
+document_query_cache: SemanticCache | None = None
+sql_query_cache: SemanticCache | None = None
 
 # Upload directory (from config, supports both Lambda /tmp and local paths)
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 CACHE_DIR = Path(settings.CACHE_DIR)
 
+# Process pool for CPU-bound parsing/chunking (created lazily on first upload)
+parse_pool: ProcessPoolExecutor | None = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor | None:
+    """
+    Get the executor used for document parsing.
+    Returns None (default thread pool) on Lambda, which lacks the shared-memory
+    semaphores multiprocessing needs.
+    """
+    global parse_pool
+
+    if settings.is_lambda:
+        return None
+
+    if parse_pool is None:
+        # Don't fork: workers would inherit the log listener's and gRPC's threads
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        mp_context = multiprocessing.get_context(start_method)
+        parse_pool = ProcessPoolExecutor(
+            max_workers=settings.PARSE_WORKERS or os.cpu_count(),
+            mp_context=mp_context,
+            initializer=configure_worker_logging,
+            initargs=(create_worker_log_queue(mp_context), logger.level)
+        )
+    return parse_pool
+
+
+# /info is immutable for the process lifetime, so serialize it once
+INFO_JSON = orjson.dumps({
+    "application": {
+        "name": "Multi-Source RAG + Text-to-SQL",
+        "version": "0.1.0",
+        "environment": "development",  # Will be loaded from settings once .env exists
+    },
+    "features": {
+        "document_rag": "Available - Phase 1 Complete",
+        "text_to_sql": "Available - Phase 2 Complete",
+        "query_routing": "Available - Phase 3 Complete",
+        "evaluation_monitoring": "Available - Phase 4 Complete",
+        "polish_documentation": "Available - Phase 5 Complete",
+        "docker_deployment": "Available - Phase 6 Complete",
+    },
+    "deployment": {
+        "docker": "Ready - Use docker-compose up",
+        "dockerfile": "Multi-stage build optimized",
+        "health_checks": "Enabled",
+        "volumes": ["uploads", "vanna_chromadb"]
+    },
+    "system": {
+        "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
+    },
+    "endpoints": {
+        "docs": "/docs",
+        "redoc": "/redoc",
+        "health": "/health (enhanced with service checks)",
+        "info": "/info",
+        "stats": "/stats (system statistics)",
+        "unified_query": "POST /query (recommended - intelligent routing)",
+        "upload_document": "POST /upload (with validation)",
+        "query_documents": "POST /query/documents (with validation)",
+        "list_documents": "GET /documents",
+        "generate_sql": "POST /query/sql/generate",
+        "execute_sql": "POST /query/sql/execute",
+        "pending_sql_queries": "GET /query/sql/pending",
+    },
+})
+INFO_ETAG = f'"{hashlib.blake2b(INFO_JSON, digest_size=8).hexdigest()}"'
+INFO_HEADERS = {"ETag": INFO_ETAG, "Cache-Control": "public, max-age=3600"}
+
+# Static part of /health (only service state and timestamp vary per request)
+HEALTH_CONFIGURATION = {
+    "openai_configured": settings.OPENAI_API_KEY is not None,
+    "pinecone_configured": settings.PINECONE_API_KEY is not None,
+    "database_configured": settings.DATABASE_URL is not None,
+    "opik_configured": settings.OPIK_API_KEY is not None if hasattr(settings, 'OPIK_API_KEY') else False,
+}
+
+
+def _scan_upload_dir() -> list[dict]:
+    """
+    List uploaded files with one stat() per file (os.scandir caches DirEntry results).
+
+    Returns:
+        List of dicts with filename, size_bytes, and uploaded_at
+    """
+    documents = []
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.'):
+                stat_result = entry.stat()
+                documents.append({
+                    "filename": entry.name,
+                    "size_bytes": stat_result.st_size,
+                    "uploaded_at": datetime.fromtimestamp(stat_result.st_mtime).isoformat()
+                })
+    return documents
+
+
+# Serialized /documents body, keyed by (generation, upload directory mtime).
+# upload_document bumps the generation to invalidate the cached listing.
+_doc_list_generation = 0
+_doc_list_cache: tuple[int, int, bytes] | None = None
+
+
+def _get_document_list_json() -> bytes:
+    """
+    Get the /documents response body, rescanning only when the upload directory changes.
+    Adding or removing a file bumps the directory mtime; overwrites are handled by
+    upload_document bumping the cache generation.
+
+    Returns:
+        JSON-encoded document list
+    """
+    global _doc_list_cache
+
+    generation = _doc_list_generation
+    dir_mtime = UPLOAD_DIR.stat().st_mtime_ns
+    if _doc_list_cache and _doc_list_cache[:2] == (generation, dir_mtime):
+        return _doc_list_cache[2]
+
+    documents = _scan_upload_dir()
+    body = orjson.dumps({
+        "total_documents": len(documents),
+        "documents": documents
+    })
+
+    # Don't cache a scan that may predate an upload that finished while it ran
+    if _doc_list_generation == generation:
+        _doc_list_cache = (generation, dir_mtime, body)
+    return body
+
+
+async def _embed_and_store(chunks: list[dict], filename: str) -> list[list[float]]:
+    """
+    Embed chunks and upsert them to Pinecone as a two-stage pipeline.
+    Each embedding batch is queued for upsert as soon as it completes, so
+    storage overlaps with the remaining embedding requests.
+
+    Args:
+        chunks: Chunk dictionaries to embed and store
+        filename: Source filename for vector metadata
+
+    Returns:
+        Embeddings in the same order as `chunks`
+    """
+    loop = asyncio.get_running_loop()
+    embeddings: list[list[float] | None] = [None] * len(chunks)
+    batch_queue: asyncio.Queue = asyncio.Queue()
+    upserted_ids: list[str] = []  # Vector IDs this attempt may have written
+
+    async def embed_stage():
+        try:
+            texts = [chunk['text'] for chunk in chunks]
+            async with aclosing(embedding_service.iter_embedding_batches(texts)) as batches:
+                async for indices, batch_embeddings in batches:
+                    for index, embedding in zip(indices, batch_embeddings):
+                        embeddings[index] = embedding
+                    await batch_queue.put((indices, batch_embeddings))
+        finally:
+            await batch_queue.put(None)  # Always release the store stage
+
+    async def store_stage():
+        while (item := await batch_queue.get()) is not None:
+            indices, batch_embeddings = item
+            # Record before upserting: a failed upsert may still have written some batches
+            upserted_ids.extend(f"{filename}_{chunks[i]['chunk_index']}" for i in indices)
+            await loop.run_in_executor(
+                None,
+                partial(
+                    vector_service.add_documents,
+                    chunks=[chunks[i] for i in indices],
+                    embeddings=batch_embeddings,
+                    filename=filename,
+                    namespace="default"
+                )
+            )
+
+    embed_task = asyncio.create_task(embed_stage())
+    try:
+        await store_stage()
+        await embed_task
+    except BaseException:
+        # Stop embedding if storing failed, and wait for it to unwind
+        embed_task.cancel()
+        await asyncio.gather(embed_task, return_exceptions=True)
+
+        # Don't leave a partially indexed document behind. Only this attempt's IDs are
+        # deleted, so other chunks from an earlier upload of the file are kept
+        try:
+            if upserted_ids:
+                await loop.run_in_executor(
+                    None, partial(vector_service.delete_by_ids, upserted_ids, namespace="default")
+                )
+        except Exception as cleanup_error:
+            logger.warning("Failed to remove partial vectors for %s: %s", filename, cleanup_error)
+        raise
+
+    return embeddings
+
 
 @app.get("/health", status_code=status.HTTP_200_OK, tags=["Health"])
 async def health_check():
@@ -94,61 +308,23 @@ async def health_check():
             "text_to_sql": services_status["sql_service"],
             "query_routing": True,  # Always available (keyword-based)
         },
-        "configuration": {
-            "openai_configured": settings.OPENAI_API_KEY is not None,
-            "pinecone_configured": settings.PINECONE_API_KEY is not None,
-            "database_configured": settings.DATABASE_URL is not None,
-            "opik_configured": settings.OPIK_API_KEY is not None if hasattr(settings, 'OPIK_API_KEY') else False,
-        }
+        "configuration": HEALTH_CONFIGURATION
     }
 
 
 @app.get("/info", status_code=status.HTTP_200_OK, tags=["Information"])
-async def get_info():
+async def get_info(request: Request):
     """
     Get system information and configuration details.
+    Served from precomputed JSON with a strong ETag (304 when unchanged).
 
     Returns:
         dict: System information including Python version, environment, and features
     """
-    return {
-        "application": {
-            "name": "Multi-Source RAG + Text-to-SQL",
-            "version": "0.1.0",
-            "environment": "development",  # Will be loaded from settings once .env exists
-        },
-        "features": {
-            "document_rag": "Available - Phase 1 Complete",
-            "text_to_sql": "Available - Phase 2 Complete",
-            "query_routing": "Available - Phase 3 Complete",
-            "evaluation_monitoring": "Available - Phase 4 Complete",
-            "polish_documentation": "Available - Phase 5 Complete",
-            "docker_deployment": "Available - Phase 6 Complete",
-        },
-        "deployment": {
-            "docker": "Ready - Use docker-compose up",
-            "dockerfile": "Multi-stage build optimized",
-            "health_checks": "Enabled",
-            "volumes": ["uploads", "vanna_chromadb"]
-        },
-        "system": {
-            "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-        },
-        "endpoints": {
-            "docs": "/docs",
-            "redoc": "/redoc",
-            "health": "/health (enhanced with service checks)",
-            "info": "/info",
-            "stats": "/stats (system statistics)",
-            "unified_query": "POST /query (recommended - intelligent routing)",
-            "upload_document": "POST /upload (with validation)",
-            "query_documents": "POST /query/documents (with validation)",
-            "list_documents": "GET /documents",
-            "generate_sql": "POST /query/sql/generate",
-            "execute_sql": "POST /query/sql/execute",
-            "pending_sql_queries": "GET /query/sql/pending",
-        },
-    }
+    if request.headers.get("if-none-match") in (INFO_ETAG, "*"):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=INFO_HEADERS)
+
+    return Response(content=INFO_JSON, media_type="application/json", headers=INFO_HEADERS)
 
 
 @app.get("/", tags=["Root"])
@@ -187,7 +363,7 @@ async def upload_document(file: UploadFile = File(...)):
     Raises:
         HTTPException: If validation fails or services unavailable
     """
-    global embedding_service, vector_service, cache_service
+    global embedding_service, vector_service, cache_service, document_query_cache, _doc_list_generation
 
     # Validate file
     try:
@@ -209,10 +385,18 @@ async def upload_document(file: UploadFile = File(...)):
         )
 
     try:
-        # Save uploaded file
+        loop = asyncio.get_running_loop()
+
+        # Save uploaded file (streamed in 1 MB chunks without blocking the event loop)
         file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(1 << 20):
+                await buffer.write(chunk)
+
+        # Overwriting an existing file doesn't bump the directory mtime
+        _doc_list_generation += 1
+
+        file_size = (await loop.run_in_executor(None, file_path.stat)).st_size
 
         # NEW: Compute unique document ID from file contents
         doc_id = None
@@ -222,12 +406,12 @@ async def upload_document(file: UploadFile = File(...)):
 
         if cache_service:
             try:
-                doc_id = cache_service.compute_document_id(file_path)
-                logger.info(f"Document ID computed: {doc_id}")
+                doc_id = await loop.run_in_executor(None, cache_service.compute_document_id, file_path)
+                logger.info("Document ID computed: %s", doc_id)
 
                 # NEW: Check if cache exists for this document
                 if cache_service.cache_exists(doc_id):
-                    logger.info(f"Cache HIT for document: {file.filename} (ID: {doc_id[:8]}...)")
+                    logger.info("Cache HIT for document: %s (ID: %.8s...)", file.filename, doc_id)
 
                     # Load from cache
                     cached_data = cache_service.load_chunks_and_embeddings(doc_id)
@@ -236,31 +420,34 @@ async def upload_document(file: UploadFile = File(...)):
                         chunks = cached_data['chunks']
                         embeddings = cached_data['embeddings']
                         cache_hit = True
-                        logger.info(f"Loaded {len(chunks)} chunks from cache, skipping processing")
+                        logger.info("Loaded %d chunks from cache, skipping processing", len(chunks))
                     else:
                         logger.warning("Cache load failed, falling back to full processing")
                 else:
-                    logger.info(f"Cache MISS for document: {file.filename} (ID: {doc_id[:8]}...)")
+                    logger.info("Cache MISS for document: %s (ID: %.8s...)", file.filename, doc_id)
 
             except Exception as e:
-                logger.warning(f"Cache check failed, proceeding with full processing: {e}")
+                logger.warning("Cache check failed, proceeding with full processing: %s", e)
 
         # If cache miss or cache unavailable, process document
         if chunks is None or embeddings is None:
             # Parse and chunk with context-aware approach (Docling with smart merging)
-            logger.info(f"Parsing and chunking document with context awareness: {file.filename}")
-            from app.services.document_service import parse_and_chunk_with_context
-            chunks = parse_and_chunk_with_context(
+            logger.info("Parsing and chunking document with context awareness: %s", file.filename)
+            chunks = await loop.run_in_executor(
+                get_parse_executor(),
+                parse_and_chunk_with_context,
                 str(file_path),
-                chunk_size=settings.CHUNK_SIZE,
-                min_chunk_size=settings.MIN_CHUNK_SIZE
+                settings.CHUNK_SIZE,
+                settings.MIN_CHUNK_SIZE
+            )
+            logger.info(
+                "Created %d context-aware chunks (target %d-%d tokens)",
+                len(chunks), settings.MIN_CHUNK_SIZE, settings.CHUNK_SIZE
             )
-            logger.info(f"Created {len(chunks)} context-aware chunks (target {settings.MIN_CHUNK_SIZE}-{settings.CHUNK_SIZE} tokens)")
 
-            # Generate embeddings
-            logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-            texts = [chunk['text'] for chunk in chunks]
-            embeddings = await embedding_service.generate_embeddings(texts)
+            # Generate embeddings and store them in Pinecone as each batch completes
+            logger.info("Embedding and storing %d chunks in Pinecone...", len(chunks))
+            embeddings = await _embed_and_store(chunks, file.filename)
 
             # NEW: Save to cache if cache service is available
             if cache_service and doc_id:
@@ -270,9 +457,10 @@ async def upload_document(file: UploadFile = File(...)):
                         "document_id": doc_id,
                         "original_filename": file.filename,
                         "upload_timestamp": datetime.utcnow().isoformat() + "Z",
-                        "file_size_bytes": file_path.stat().st_size,
+                        "file_size_bytes": file_size,
                         "chunk_count": len(chunks),
                         "embedding_model": "text-embedding-3-small",
+                        "embedding_dtype": settings.EMBEDDING_DTYPE,
                         "chunk_size": settings.CHUNK_SIZE,
                         "chunk_overlap": settings.CHUNK_OVERLAP
                     }
@@ -284,22 +472,28 @@ async def upload_document(file: UploadFile = File(...)):
                         embeddings=embeddings,
                         metadata=metadata
                     )
-                    logger.info(f"Saved to cache: {doc_id}")
+                    logger.info("Saved to cache: %s", doc_id)
 
                 except Exception as e:
                     # Don't fail upload if caching fails
-                    logger.warning(f"Failed to save to cache (continuing anyway): {e}")
-
-        # Store in Pinecone (always, even on cache hit - in case vector DB was cleared)
-        logger.info(f"Storing {len(chunks)} vectors in Pinecone...")
-        vector_service.add_documents(
-            chunks=chunks,
-            embeddings=embeddings,
-            filename=file.filename,
-            namespace="default"
-        )
+                    logger.warning("Failed to save to cache (continuing anyway): %s", e)
+        else:
+            # Cache hit: still store in Pinecone (in case vector DB was cleared)
+            logger.info("Storing %d vectors in Pinecone...", len(chunks))
+            await loop.run_in_executor(
+                None,
+                partial(
+                    vector_service.add_documents,
+                    chunks=chunks,
+                    embeddings=embeddings,
+                    filename=file.filename,
+                    namespace="default"
+                )
+            )
 
-        file_size = file_path.stat().st_size
+        # New content can change document answers, so drop cached ones
+        if document_query_cache:
+            document_query_cache.clear()
 
         return {
             "status": "success",
@@ -346,7 +540,7 @@ async def query_documents(question: str, top_k: int = 3):
     Raises:
         HTTPException: If validation fails or service unavailable
     """
-    global rag_service
+    global rag_service, query_embedder, document_query_cache
 
     # Validate inputs
     try:
@@ -369,13 +563,33 @@ async def query_documents(question: str, top_k: int = 3):
         )
 
     try:
+        # Check semantic cache for a near-duplicate question
+        query_embedding = None
+        cached = None
+        if document_query_cache and query_embedder:
+            try:
+                query_embedding = await query_embedder.get_or_embed(question)
+                cached = document_query_cache.lookup(
+                    query_embedding, threshold=settings.SEMANTIC_CACHE_THRESHOLD, key=top_k
+                )
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed, answering without it: %s", e)
+                query_embedding = None
+
+        if cached:
+            return {**cached, "question": question, "cache_hit": True}
+
         result = await rag_service.generate_answer(
             question=question,
             top_k=top_k,
             namespace="default",
-            include_sources=True
+            include_sources=True,
+            query_embedding=query_embedding
         )
 
+        if document_query_cache and query_embedding is not None:
+            document_query_cache.store(query_embedding, result, key=top_k)
+
         return result
 
     except Exception as e:
@@ -389,24 +603,16 @@ async def query_documents(question: str, top_k: int = 3):
 async def list_documents():
     """
     List all uploaded documents.
+    Served from a cached listing until the upload directory changes.
 
     Returns:
         dict: List of uploaded documents with metadata
     """
     try:
-        documents = []
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                documents.append({
-                    "filename": file_path.name,
-                    "size_bytes": file_path.stat().st_size,
-                    "uploaded_at": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-                })
+        # Scan off the event loop so a slow filesystem doesn't stall other requests
+        body = await asyncio.get_running_loop().run_in_executor(None, _get_document_list_json)
 
-        return {
-            "total_documents": len(documents),
-            "documents": documents
-        }
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list documents: {str(e)}")
@@ -424,23 +630,14 @@ async def get_stats():
 
     try:
         # Count uploaded documents
-        documents = []
-        total_size = 0
-
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                file_size = file_path.stat().st_size
-                documents.append({
-                    "filename": file_path.name,
-                    "size_bytes": file_size,
-                })
-                total_size += file_size
+        documents = await asyncio.get_running_loop().run_in_executor(None, _scan_upload_dir)
+        total_size = sum(doc["size_bytes"] for doc in documents)
 
         # Get pending SQL queries count
         pending_sql_count = 0
         if sql_service:
             try:
-                pending_sql_count = len(sql_service.get_pending_queries())
+                pending_sql_count = len(await sql_service.get_pending_queries())
             except Exception:
                 pass
 
@@ -480,7 +677,7 @@ async def get_cache_stats():
     Returns:
         dict: Cache statistics including document count and total size
     """
-    global cache_service
+    global cache_service, document_query_cache, sql_query_cache
 
     if not cache_service:
         raise HTTPException(
@@ -496,6 +693,9 @@ async def get_cache_stats():
         return {
             "status": "success",
             "cache_stats": stats,
+            "semantic_cache_stats": [
+                cache.get_stats() for cache in (document_query_cache, sql_query_cache) if cache
+            ],
             "message": f"Cache contains {stats['total_documents']} documents"
         }
 
@@ -704,7 +904,7 @@ async def generate_sql(question: str):
     Returns:
         dict: Generated SQL with query_id for approval
     """
-    global sql_service
+    global sql_service, query_embedder, sql_query_cache
 
     if not sql_service:
         raise HTTPException(
@@ -713,7 +913,33 @@ async def generate_sql(question: str):
         )
 
     try:
+        # Check semantic cache; a hit reuses the SQL but mints a fresh query_id
+        question_embedding = None
+        cached = None
+        if sql_query_cache and query_embedder:
+            try:
+                question_embedding = await query_embedder.get_or_embed(question)
+                cached = sql_query_cache.lookup(
+                    question_embedding, threshold=settings.SEMANTIC_CACHE_THRESHOLD
+                )
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed, generating without it: %s", e)
+                question_embedding = None
+
+        if cached:
+            return {
+                **await sql_service.create_pending_query(question, cached['sql'], cached['explanation']),
+                "cache_hit": True
+            }
+
         result = await sql_service.generate_sql_for_approval(question)
+
+        if sql_query_cache and question_embedding is not None:
+            sql_query_cache.store(
+                question_embedding,
+                {"sql": result['sql'], "explanation": result['explanation']}
+            )
+
         return result
 
     except Exception as e:
@@ -772,7 +998,7 @@ async def list_pending_sql_queries():
         )
 
     try:
-        pending = sql_service.get_pending_queries()
+        pending = await sql_service.get_pending_queries()
         return {
             "total_pending": len(pending),
             "pending_queries": pending
@@ -785,11 +1011,12 @@ async def list_pending_sql_queries():
 def initialize_services():
     """Initialize all services. Called directly on Lambda startup or via FastAPI startup event."""
     global embedding_service, vector_service, rag_service, sql_service, cache_service
+    global query_embedder, document_query_cache, sql_query_cache
 
     # Ensure upload and cache directories exist
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Storage directories initialized: {UPLOAD_DIR}, {CACHE_DIR}")
+    logger.info("Storage directories initialized: %s, %s", UPLOAD_DIR, CACHE_DIR)
 
     logger.info("=" * 60)
     logger.info("Starting Multi-Source RAG + Text-to-SQL API...")
@@ -817,15 +1044,22 @@ def initialize_services():
                 logger.warning("OPIK available but API key not configured.")
                 logger.info("Monitoring will use local tracking only.")
         except Exception as e:
-            logger.warning(f"Failed to initialize OPIK: {e}")
+            logger.warning("Failed to initialize OPIK: %s", e)
     else:
         logger.info("OPIK not available (package not installed).")
 
+    # Initialize embedding service (shared by document RAG and the semantic query caches)
+    try:
+        if settings.OPENAI_API_KEY:
+            embedding_service = EmbeddingService()
+            query_embedder = CoalescingEmbedder(embedding_service)
+    except Exception as e:
+        logger.error("Failed to initialize embedding service: %s", e, exc_info=True)
+
     # Initialize Document RAG services if API keys are available
     try:
-        if settings.OPENAI_API_KEY and settings.PINECONE_API_KEY:
+        if embedding_service and settings.PINECONE_API_KEY:
             logger.info("Initializing Document RAG services...")
-            embedding_service = EmbeddingService()
             vector_service = VectorService()
             vector_service.connect_to_index()
             rag_service = RAGService()
@@ -834,7 +1068,7 @@ def initialize_services():
             logger.warning("OpenAI/Pinecone API keys not configured.")
             logger.warning("Document RAG features will be unavailable.")
     except Exception as e:
-        logger.error(f"Failed to initialize RAG services: {e}", exc_info=True)
+        logger.error("Failed to initialize RAG services: %s", e, exc_info=True)
         logger.warning("Document RAG features will be unavailable.")
 
     # Initialize Text-to-SQL service if database is available
@@ -849,18 +1083,32 @@ def initialize_services():
             logger.warning("DATABASE_URL not configured.")
             logger.warning("Text-to-SQL features will be unavailable.")
     except Exception as e:
-        logger.error(f"Failed to initialize SQL service: {e}", exc_info=True)
+        logger.error("Failed to initialize SQL service: %s", e, exc_info=True)
         logger.warning("Text-to-SQL features will be unavailable.")
 
     # Initialize cache service (always available, no API key needed)
     try:
         logger.info("Initializing cache service...")
-        cache_service = CacheService(cache_dir=CACHE_DIR)
+        cache_service = CacheService(cache_dir=CACHE_DIR, embedding_dtype=settings.EMBEDDING_DTYPE)
         logger.info("✓ Cache service initialized!")
     except Exception as e:
-        logger.error(f"✗ Failed to initialize cache service: {e}")
+        logger.error("✗ Failed to initialize cache service: %s", e)
         logger.warning("Document uploads will work but caching will be unavailable.")
 
+    # Initialize semantic query caches (in-process, no API key needed)
+    if settings.SEMANTIC_CACHE_ENABLED:
+        document_query_cache = SemanticCache(
+            name="documents",
+            ttl_seconds=settings.SEMANTIC_CACHE_TTL,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES
+        )
+        sql_query_cache = SemanticCache(
+            name="sql",
+            ttl_seconds=settings.SEMANTIC_CACHE_TTL,
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES
+        )
+        logger.info("✓ Semantic query caches initialized!")
+
     logger.info("=" * 60)
     logger.info("API is ready!")
     logger.info("=" * 60)
@@ -878,6 +1126,9 @@ async def shutdown_event():
     """Execute cleanup tasks on application shutdown."""
     logger.info("Shutting down Multi-Source RAG + Text-to-SQL API...")
 
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+
 
 if __name__ == "__main__":
     import uvicorn
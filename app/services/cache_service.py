@@ -19,14 +19,16 @@ class CacheService:
     Uses content-based SHA-256 hashing for true deduplication.
     """
 
-    def __init__(self, cache_dir: Path):
+    def __init__(self, cache_dir: Path, embedding_dtype: str = "float32"):
         """
         Initialize cache service.
 
         Args:
             cache_dir: Directory to store cached data (e.g., data/cached_chunks/)
+            embedding_dtype: NumPy dtype for stored embeddings ("float32" or "float16")
         """
         self.cache_dir = Path(cache_dir)
+        self.embedding_dtype = np.dtype(embedding_dtype)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Cache service initialized at: {self.cache_dir}")
 
@@ -121,9 +123,9 @@ class CacheService:
             with open(chunks_file, 'w', encoding='utf-8') as f:
                 json.dump(chunks, f, indent=2, ensure_ascii=False)
 
-            # Save embeddings as NumPy binary array (float32 for efficiency)
+            # Save embeddings as NumPy binary array (float32, or float16 to halve disk usage)
             embeddings_file = cache_path / 'embeddings.npy'
-            embeddings_array = np.array(embeddings, dtype=np.float32)
+            embeddings_array = np.array(embeddings, dtype=self.embedding_dtype)
             np.save(embeddings_file, embeddings_array)
 
             # Save metadata as JSON
@@ -172,9 +174,9 @@ class CacheService:
             with open(chunks_file, 'r', encoding='utf-8') as f:
                 chunks = json.load(f)
 
-            # Load embeddings
+            # Load embeddings (upcast float16 caches back to float32)
             embeddings_file = cache_path / 'embeddings.npy'
-            embeddings_array = np.load(embeddings_file)
+            embeddings_array = np.load(embeddings_file).astype(np.float32, copy=False)
             embeddings = embeddings_array.tolist()  # Convert to list for consistency
 
             # Load metadata
@@ -3,7 +3,10 @@ Embedding Service
 Handles generation of embeddings using OpenAI's API.
 """
 
-from typing import List
+from typing import AsyncIterator, Dict, List, Tuple
+import asyncio
+import hashlib
+from functools import partial
 from openai import AsyncOpenAI
 from app.config import settings
 
@@ -26,6 +29,10 @@ class EmbeddingService:
         self.model = "text-embedding-3-small"  # 1536 dimensions
         self.dimensions = 1536
 
+        # Caps concurrent embedding requests to stay within provider rate limits
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self._request_semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
@@ -59,6 +66,39 @@ class EmbeddingService:
         except Exception as e:
             raise Exception(f"Failed to generate embeddings: {str(e)}")
 
+    async def iter_embedding_batches(
+        self, texts: List[str]
+    ) -> AsyncIterator[Tuple[List[int], List[List[float]]]]:
+        """
+        Embed many texts in concurrent micro-batches, yielding each batch as it completes.
+
+        Texts are sorted by length (longest first) so each batch holds similarly
+        sized inputs, split into batches of `batch_size`, and embedded concurrently
+        (bounded by EMBEDDING_MAX_CONCURRENCY). Batches are yielded in completion
+        order so callers can start storing results before all batches finish.
+
+        Args:
+            texts: List of text strings to embed
+
+        Yields:
+            Tuples of (input indices, embeddings for those indices)
+        """
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        index_batches = [order[k:k + self.batch_size] for k in range(0, len(texts), self.batch_size)]
+
+        async def embed_batch(indices: List[int]) -> Tuple[List[int], List[List[float]]]:
+            async with self._request_semaphore:
+                return indices, await self.generate_embeddings([texts[i] for i in indices])
+
+        tasks = [asyncio.create_task(embed_batch(indices)) for indices in index_batches]
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                yield await next_batch
+        finally:
+            # Stop outstanding requests if the consumer fails or stops early
+            for task in tasks:
+                task.cancel()
+
     async def generate_single_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text.
@@ -80,3 +120,53 @@ class EmbeddingService:
             int: Embedding dimension (1536 for text-embedding-3-small)
         """
         return self.dimensions
+
+
+class CoalescingEmbedder:
+    """
+    Single-flight wrapper around EmbeddingService for query embeddings.
+    Concurrent requests for the same text share one in-flight API call
+    instead of each embedding it independently.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService):
+        """
+        Initialize the coalescing embedder.
+
+        Args:
+            embedding_service: Service used to compute embeddings
+        """
+        self.embedding_service = embedding_service
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_embed(self, text: str) -> List[float]:
+        """
+        Embed text, joining an identical in-flight request if one exists.
+
+        Args:
+            text: Text string to embed
+
+        Returns:
+            Embedding vector (list of floats)
+        """
+        key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+        # Check-and-insert has no await in between, so it is atomic on the event loop
+        task = self._inflight.get(key)
+        if task is None:
+            # The shared call runs as its own task so no single caller owns it
+            task = asyncio.ensure_future(self.embedding_service.generate_single_embedding(text))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._on_embedding_done, key))
+
+        # Shield so a cancelled caller (leader included) doesn't cancel the others
+        return await asyncio.shield(task)
+
+    def _on_embedding_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished embedding task so later requests start a fresh call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Mark the error retrieved in case every caller was cancelled before it finished
+        if not task.cancelled():
+            task.exception()
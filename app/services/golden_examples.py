@@ -0,0 +1,41 @@
+"""
+Golden Examples
+Question → SQL pairs included in the Text-to-SQL schema context.
+Defined once at import time as an immutable constant.
+"""
+
+from typing import NamedTuple
+
+
+class GoldenExample(NamedTuple):
+    """A natural language question with its reference SQL."""
+
+    question: str
+    sql: str
+
+
+GOLDEN_EXAMPLES: tuple[GoldenExample, ...] = (
+    GoldenExample(
+        "How many customers do we have?",
+        "SELECT COUNT(*) as customer_count FROM customers;",
+    ),
+    GoldenExample(
+        "What is the total revenue from all orders?",
+        "SELECT SUM(total_amount) as total_revenue FROM orders;",
+    ),
+    GoldenExample(
+        "List all delivered orders",
+        "SELECT * FROM orders WHERE status = 'Delivered' ORDER BY order_date DESC;",
+    ),
+    GoldenExample(
+        "How many orders per customer segment?",
+        "SELECT c.segment, COUNT(o.id) as order_count FROM customers c "
+        "LEFT JOIN orders o ON c.id = o.customer_id GROUP BY c.segment;",
+    ),
+    GoldenExample(
+        "Top 10 customers by total spending",
+        "SELECT c.name, c.email, SUM(o.total_amount) as total_spent FROM customers c "
+        "JOIN orders o ON c.id = o.customer_id GROUP BY c.id, c.name, c.email "
+        "ORDER BY total_spent DESC LIMIT 10;",
+    ),
+)
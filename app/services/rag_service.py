@@ -39,7 +39,8 @@ class RAGService:
         question: str,
         top_k: int = 3,
         namespace: str = "default",
-        include_sources: bool = True
+        include_sources: bool = True,
+        query_embedding: List[float] | None = None
     ) -> Dict[str, Any]:
         """
         Full RAG pipeline: retrieve relevant chunks and generate an answer.
@@ -49,6 +50,7 @@ class RAGService:
             top_k: Number of chunks to retrieve (default: 3)
             namespace: Pinecone namespace to search (default: "default")
             include_sources: Whether to include source citations (default: True)
+            query_embedding: Precomputed question embedding (optional, skips re-embedding)
 
         Returns:
             Dictionary containing:
@@ -59,8 +61,9 @@ class RAGService:
                 - model: LLM model used
         """
         try:
-            # Step 1: Generate query embedding
-            query_embedding = await self.embedding_service.generate_single_embedding(question)
+            # Step 1: Generate query embedding (unless the caller already has one)
+            if query_embedding is None:
+                query_embedding = await self.embedding_service.generate_single_embedding(question)
 
             # Step 2: Search for relevant chunks in Pinecone
             search_results = await self.vector_service.search(
@@ -0,0 +1,155 @@
+"""
+Semantic Cache Service
+Caches query results keyed on question embeddings so near-duplicate questions
+skip retrieval and LLM generation entirely.
+"""
+
+import logging
+import time
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("rag_app.semantic_cache_service")
+
+
+class SemanticCache:
+    """
+    In-process semantic cache backed by a matrix of L2-normalized embeddings.
+    A lookup is a single matrix-vector product (cosine similarity) against all
+    live entries; entries expire after a fixed TTL. Entries can be stored under
+    an optional key (e.g., request parameters) that a lookup must match exactly.
+    """
+
+    def __init__(self, name: str, ttl_seconds: int = 300, max_entries: int = 1000):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            name: Cache name used in log messages (e.g., "documents", "sql")
+            ttl_seconds: Time-to-live for each cached entry (default: 300)
+            max_entries: Maximum entries kept; oldest are evicted first (default: 1000)
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._vectors: Optional[np.ndarray] = None  # (N x dim) normalized embeddings
+        self._values: List[Any] = []
+        self._keys: List[Hashable] = []
+        self._expires_at: List[float] = []
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """L2-normalize an embedding so a dot product equals cosine similarity."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _evict_expired(self) -> None:
+        """Drop entries whose TTL has elapsed (entries are stored oldest first)."""
+        now = time.monotonic()
+        expired = 0
+        while expired < len(self._expires_at) and self._expires_at[expired] <= now:
+            expired += 1
+
+        if expired:
+            self._vectors = self._vectors[expired:] if expired < len(self._values) else None
+            del self._values[:expired]
+            del self._keys[:expired]
+            del self._expires_at[:expired]
+
+    def lookup(
+        self,
+        embedding: List[float],
+        threshold: float = 0.95,
+        key: Hashable = None
+    ) -> Optional[Any]:
+        """
+        Return the cached value for the most similar stored question.
+
+        Args:
+            embedding: Question embedding
+            threshold: Minimum cosine similarity for a hit (default: 0.95)
+            key: Only entries stored under this key can match (default: None)
+
+        Returns:
+            Cached value on hit, None on miss
+        """
+        self._evict_expired()
+
+        if self._vectors is None:
+            self.misses += 1
+            return None
+
+        candidates = [i for i, entry_key in enumerate(self._keys) if entry_key == key]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        # Skip the gather copy when every entry shares the key (e.g., the SQL cache)
+        vectors = self._vectors if len(candidates) == len(self._keys) else self._vectors[candidates]
+        similarities = vectors @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+
+        if similarities[best] >= threshold:
+            self.hits += 1
+            logger.info("Semantic cache HIT (%s, similarity=%.3f)", self.name, similarities[best])
+            return self._values[candidates[best]]
+
+        self.misses += 1
+        return None
+
+    def store(self, embedding: List[float], value: Any, key: Hashable = None) -> None:
+        """
+        Store a value under a question embedding.
+
+        Args:
+            embedding: Question embedding
+            value: Result to return for similar future questions
+            key: Key a lookup must pass to match this entry (default: None)
+        """
+        self._evict_expired()
+
+        vector = self._normalize(embedding)[np.newaxis, :]
+        if self._vectors is None:
+            self._vectors = vector
+        else:
+            self._vectors = np.vstack([self._vectors, vector])
+        self._values.append(value)
+        self._keys.append(key)
+        self._expires_at.append(time.monotonic() + self.ttl_seconds)
+
+        # Evict oldest entries beyond capacity
+        overflow = len(self._values) - self.max_entries
+        if overflow > 0:
+            self._vectors = self._vectors[overflow:]
+            del self._values[:overflow]
+            del self._keys[:overflow]
+            del self._expires_at[:overflow]
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._vectors = None
+        self._values.clear()
+        self._keys.clear()
+        self._expires_at.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, hits, and misses
+        """
+        self._evict_expired()
+        return {
+            "name": self.name,
+            "entries": len(self._values),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+        }
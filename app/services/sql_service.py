@@ -4,9 +4,14 @@ Handles Text-to-SQL conversion using Vanna.ai 2.0 with OpenAI and PostgreSQL.
 """
 
 from typing import Dict, Any, List, Optional
+from functools import lru_cache
 import uuid
+import json
+import hashlib
+import time
 import asyncio
 import pandas as pd
+import sqlalchemy
 import logging
 
 logger = logging.getLogger("rag_app.sql_service")
@@ -14,7 +19,8 @@ logger = logging.getLogger("rag_app.sql_service")
 # Vanna 2.0 Agent Framework imports
 from vanna import Agent
 from vanna.integrations.openai import OpenAILlmService
-from vanna.integrations.postgres import PostgresRunner
+from vanna.capabilities.sql_runner import SqlRunner, RunSqlToolArgs
+from vanna.core.tool import ToolContext
 from vanna.core.registry import ToolRegistry
 from vanna.tools import RunSqlTool
 from vanna.core.user import UserResolver, User, RequestContext
@@ -28,7 +34,223 @@ except ImportError:
     # Fallback to local memory
     from vanna.integrations.local.agent_memory import DemoAgentMemory
 
+# Redis for shared pending-query storage (optional - falls back to in-process)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 from app.config import settings
+from app.services.golden_examples import GOLDEN_EXAMPLES
+
+
+@lru_cache(maxsize=1)
+def build_schema_context() -> str:
+    """
+    Build comprehensive schema context for the Vanna 2.0 Agent.
+    Provides same information as legacy Vanna training. The context is static,
+    so it is built once per process and reused by every service instance.
+
+    Returns:
+        Formatted schema documentation string
+    """
+    schema_parts = []
+
+    # Header
+    schema_parts.append("DATABASE SCHEMA DOCUMENTATION")
+    schema_parts.append("=" * 60)
+
+    # Database overview
+    documentation = """
+This is an e-commerce database with three main tables:
+- customers: Contains customer information including name, email, segment (SMB, Enterprise, Individual), and country
+- products: Product catalog with name, category, price, stock quantity, and description
+- orders: Customer orders with order date, total amount, status (Pending, Delivered, Cancelled, Processing), and shipping address
+
+The customers table has a one-to-many relationship with orders (one customer can have many orders).
+
+IMPORTANT NOTES:
+- For order revenue/pricing, use orders.total_amount (NOT 'price')
+- Customer segments: 'SMB', 'Enterprise', 'Individual' (case-sensitive)
+- Order statuses: 'Pending', 'Delivered', 'Cancelled', 'Processing' (case-sensitive)
+- To join customers and orders: JOIN orders ON customers.id = orders.customer_id
+"""
+    schema_parts.append(documentation)
+
+    # Table schemas
+    schema_parts.append("\nTABLE SCHEMAS:")
+    schema_parts.append("-" * 60)
+
+    schema_parts.append("""
+Table: customers
+Columns:
+  - id (SERIAL PRIMARY KEY)
+  - name (VARCHAR) - Customer full name
+  - email (VARCHAR) - Customer email address
+  - segment (VARCHAR) - One of: 'SMB', 'Enterprise', 'Individual'
+  - country (VARCHAR) - Customer country
+  - created_at (TIMESTAMP)
+  - updated_at (TIMESTAMP)
+""")
+
+    schema_parts.append("""
+Table: products
+Columns:
+  - id (SERIAL PRIMARY KEY)
+  - name (VARCHAR) - Product name
+  - category (VARCHAR) - Product category (Electronics, Software, Hardware, etc.)
+  - price (DECIMAL) - Product unit price
+  - stock_quantity (INT) - Current inventory count
+  - description (TEXT)
+  - created_at (TIMESTAMP)
+  - updated_at (TIMESTAMP)
+""")
+
+    schema_parts.append("""
+Table: orders
+Columns:
+  - id (SERIAL PRIMARY KEY)
+  - customer_id (INT) - Foreign key to customers.id
+  - order_date (DATE) - Date of order
+  - total_amount (DECIMAL) - TOTAL ORDER PRICE (use this for revenue, NOT 'price'!)
+  - status (VARCHAR) - One of: 'Pending', 'Delivered', 'Cancelled', 'Processing'
+  - shipping_address (TEXT)
+  - created_at (TIMESTAMP)
+  - updated_at (TIMESTAMP)
+""")
+
+    # Golden examples
+    schema_parts.append("\nEXAMPLE QUERIES:")
+    schema_parts.append("-" * 60)
+
+    for i, (question, sql) in enumerate(GOLDEN_EXAMPLES, 1):
+        schema_parts.append(f"\nExample {i}:")
+        schema_parts.append(f"Question: {question}")
+        schema_parts.append(f"SQL: {sql}")
+
+    return "\n".join(schema_parts)
+
+
+def run_sql_on_engine(engine: sqlalchemy.engine.Engine, sql: str) -> List[Dict[str, Any]]:
+    """
+    Execute SQL through a pooled SQLAlchemy engine and return plain row dicts.
+    Avoids building a pandas DataFrame for the result set.
+
+    Args:
+        engine: SQLAlchemy engine to check a connection out of
+        sql: SQL query to execute
+
+    Returns:
+        List of row dictionaries (or rows_affected for non-SELECT statements)
+    """
+    # begin() commits on exit, including writes that return rows (... RETURNING)
+    with engine.begin() as conn:
+        result = conn.execute(sqlalchemy.text(sql))
+
+        if not result.returns_rows:
+            return [{'rows_affected': result.rowcount}]
+
+        return [dict(row) for row in result.mappings().all()]
+
+
+class PooledPostgresRunner(SqlRunner):
+    """
+    Vanna SqlRunner that executes through the service's pooled SQLAlchemy engine,
+    instead of opening a new psycopg2 connection per query like PostgresRunner.
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine):
+        self.engine = engine
+
+    async def run_sql(self, args: RunSqlToolArgs, context: ToolContext) -> pd.DataFrame:
+        rows = await asyncio.to_thread(run_sql_on_engine, self.engine, args.sql)
+        return pd.DataFrame(rows)
+
+
+class PendingQueryStore:
+    """
+    TTL-bounded storage for SQL queries awaiting approval.
+    Uses Redis when configured (shared across workers, survives restarts),
+    otherwise an in-process dict with the same expiry semantics.
+    """
+
+    KEY_PREFIX = "pending:"
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 900):
+        """
+        Initialize the pending query store.
+
+        Args:
+            redis_url: Optional Redis connection URL (e.g., redis://localhost:6379/0)
+            ttl_seconds: Seconds before an unapproved query expires (default: 900)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.redis = None
+        self._local: Dict[str, tuple[float, Dict[str, Any]]] = {}
+
+        if REDIS_AVAILABLE and redis_url:
+            self.redis = aioredis.from_url(redis_url, decode_responses=True)
+            logger.info("Using Redis for pending SQL queries")
+        else:
+            logger.warning("Using in-memory storage for pending SQL queries (not shared across workers)")
+
+    def _purge_expired(self) -> None:
+        """Drop expired in-process entries."""
+        now = time.monotonic()
+        for query_id in [qid for qid, (expires_at, _) in self._local.items() if expires_at <= now]:
+            del self._local[query_id]
+
+    async def set(self, query_id: str, info: Dict[str, Any]) -> bool:
+        """
+        Store a pending query with the configured TTL, unless the ID is already in use.
+
+        Returns:
+            True if stored, False if a live query already has this ID
+        """
+        if self.redis:
+            stored = await self.redis.set(
+                f"{self.KEY_PREFIX}{query_id}", json.dumps(info), nx=True, ex=self.ttl_seconds
+            )
+            return bool(stored)
+
+        self._purge_expired()
+        if query_id in self._local:
+            return False
+        self._local[query_id] = (time.monotonic() + self.ttl_seconds, info)
+        return True
+
+    async def pop(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically remove and return a pending query.
+        Only one caller can claim a given query, so it can't be executed twice.
+
+        Returns:
+            The pending query, or None if it doesn't exist, has expired, or was already claimed
+        """
+        if self.redis:
+            value = await self.redis.getdel(f"{self.KEY_PREFIX}{query_id}")
+            return json.loads(value) if value else None
+
+        self._purge_expired()
+        entry = self._local.pop(query_id, None)
+        return entry[1] if entry else None
+
+    async def list_all(self) -> Dict[str, Dict[str, Any]]:
+        """Return all live pending queries keyed by query ID."""
+        if self.redis:
+            keys = [key async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*")]
+            if not keys:
+                return {}
+            values = await self.redis.mget(keys)
+            return {
+                key[len(self.KEY_PREFIX):]: json.loads(value)
+                for key, value in zip(keys, values)
+                if value  # Key may expire between SCAN and MGET
+            }
+
+        self._purge_expired()
+        return {qid: info for qid, (_, info) in self._local.items()}
 
 
 class SimpleUserResolver(UserResolver):
@@ -48,13 +270,18 @@ class VannaAgentWrapper:
     Handles async-to-sync conversion and component extraction.
     """
 
-    def __init__(self, openai_api_key: str, database_url: str, pinecone_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        openai_api_key: str,
+        engine: sqlalchemy.engine.Engine,
+        pinecone_api_key: Optional[str] = None
+    ):
         """
         Initialize Vanna 2.0 Agent with all components.
 
         Args:
             openai_api_key: OpenAI API key for GPT-4o
-            database_url: PostgreSQL connection string
+            engine: Pooled SQLAlchemy engine shared with TextToSQLService
             pinecone_api_key: Optional Pinecone API key for persistent memory
         """
         # Initialize OpenAI LLM with GPT-4o
@@ -63,10 +290,8 @@ class VannaAgentWrapper:
             model=settings.VANNA_MODEL  # "gpt-4o"
         )
 
-        # Initialize PostgreSQL Runner
-        self.postgres_runner = PostgresRunner(
-            connection_string=database_url
-        )
+        # Initialize PostgreSQL Runner (shares the service's connection pool)
+        self.postgres_runner = PooledPostgresRunner(engine)
 
         # Create tool registry with RunSqlTool
         self.tools = ToolRegistry()
@@ -80,7 +305,7 @@ class VannaAgentWrapper:
 
         # Initialize Agent Memory (Pinecone or local)
         if PINECONE_AVAILABLE and pinecone_api_key:
-            logger.info(f"Using Pinecone for SQL Agent memory (index: {settings.VANNA_PINECONE_INDEX})")
+            logger.info("Using Pinecone for SQL Agent memory (index: %s)", settings.VANNA_PINECONE_INDEX)
             self.memory = PineconeAgentMemory(
                 api_key=pinecone_api_key,
                 index_name=settings.VANNA_PINECONE_INDEX,
@@ -169,49 +394,6 @@ class VannaAgentWrapper:
 
         return sql
 
-    async def execute_sql_async(self, sql: str) -> List[Dict[str, Any]]:
-        """
-        Execute SQL and return results (async).
-
-        Args:
-            sql: SQL query to execute
-
-        Returns:
-            List of row dictionaries
-
-        Raises:
-            Exception: If SQL execution fails
-        """
-        return await self._execute_and_extract_results(sql)
-
-    async def _execute_and_extract_results(self, sql: str) -> List[Dict[str, Any]]:
-        """
-        Execute SQL via Agent and extract DataFrame from UI components.
-
-        Args:
-            sql: SQL query to execute
-
-        Returns:
-            List of row dictionaries
-        """
-        request_context = RequestContext()
-        results = []
-
-        # Ask Agent to run the SQL
-        message = f"Execute this SQL query:\n\n```sql\n{sql}\n```"
-
-        async for component in self.agent.send_message(
-            request_context=request_context,
-            message=message
-        ):
-            rich_comp = component.rich_component
-
-            # Extract data from DataFrameComponent
-            if hasattr(rich_comp, 'rows') and rich_comp.rows:
-                results = rich_comp.rows
-
-        return results
-
 
 class TextToSQLService:
     """
@@ -239,16 +421,28 @@ class TextToSQLService:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for Text-to-SQL features")
 
+        # Pooled SQLAlchemy engine, shared by direct execution and the Vanna Agent's runner
+        self.engine = sqlalchemy.create_engine(
+            self.database_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,  # Replace connections dropped by the server's idle timeout
+            pool_recycle=settings.DB_POOL_RECYCLE
+        )
+
         # Initialize Vanna 2.0 Agent wrapper
         pinecone_key = settings.PINECONE_API_KEY if PINECONE_AVAILABLE else None
         self.vanna = VannaAgentWrapper(
             openai_api_key=self.openai_api_key,
-            database_url=self.database_url,
+            engine=self.engine,
             pinecone_api_key=pinecone_key
         )
 
-        # Approval workflow state (in-memory)
-        self.pending_queries: Dict[str, Dict[str, Any]] = {}
+        # Approval workflow state (Redis if configured, otherwise in-process with TTL)
+        self.pending_queries = PendingQueryStore(
+            redis_url=settings.REDIS_URL,
+            ttl_seconds=settings.PENDING_QUERY_TTL
+        )
 
         # Training flag
         self.is_trained = False
@@ -261,107 +455,20 @@ class TextToSQLService:
         Prepare schema context for Vanna 2.0.
         Note: Vanna 2.0 Agent doesn't use the same training approach as legacy Vanna.
         Instead, we provide schema context with each query.
+        Nothing is embedded or persisted, so repeated calls are no-ops.
         """
+        if self.is_trained and self.schema_context:
+            logger.debug("Schema context already prepared, skipping training")
+            return
+
         logger.info("Preparing schema context for Vanna 2.0...")
 
-        # Build comprehensive schema context
-        self.schema_context = self._build_schema_context()
+        # Reuse the schema context built once per process
+        self.schema_context = build_schema_context()
 
         self.is_trained = True
         logger.info("✓ Schema context prepared for Vanna 2.0 Agent!")
 
-    def _build_schema_context(self) -> str:
-        """
-        Build comprehensive schema context by querying database.
-        Provides same information as legacy Vanna training.
-
-        Returns:
-            Formatted schema documentation string
-        """
-        schema_parts = []
-
-        # Header
-        schema_parts.append("DATABASE SCHEMA DOCUMENTATION")
-        schema_parts.append("=" * 60)
-
-        # Database overview
-        documentation = """
-This is an e-commerce database with three main tables:
-- customers: Contains customer information including name, email, segment (SMB, Enterprise, Individual), and country
-- products: Product catalog with name, category, price, stock quantity, and description
-- orders: Customer orders with order date, total amount, status (Pending, Delivered, Cancelled, Processing), and shipping address
-
-The customers table has a one-to-many relationship with orders (one customer can have many orders).
-
-IMPORTANT NOTES:
-- For order revenue/pricing, use orders.total_amount (NOT 'price')
-- Customer segments: 'SMB', 'Enterprise', 'Individual' (case-sensitive)
-- Order statuses: 'Pending', 'Delivered', 'Cancelled', 'Processing' (case-sensitive)
-- To join customers and orders: JOIN orders ON customers.id = orders.customer_id
-"""
-        schema_parts.append(documentation)
-
-        # Table schemas
-        schema_parts.append("\nTABLE SCHEMAS:")
-        schema_parts.append("-" * 60)
-
-        schema_parts.append("""
-Table: customers
-Columns:
-  - id (SERIAL PRIMARY KEY)
-  - name (VARCHAR) - Customer full name
-  - email (VARCHAR) - Customer email address
-  - segment (VARCHAR) - One of: 'SMB', 'Enterprise', 'Individual'
-  - country (VARCHAR) - Customer country
-  - created_at (TIMESTAMP)
-  - updated_at (TIMESTAMP)
-""")
-
-        schema_parts.append("""
-Table: products
-Columns:
-  - id (SERIAL PRIMARY KEY)
-  - name (VARCHAR) - Product name
-  - category (VARCHAR) - Product category (Electronics, Software, Hardware, etc.)
-  - price (DECIMAL) - Product unit price
-  - stock_quantity (INT) - Current inventory count
-  - description (TEXT)
-  - created_at (TIMESTAMP)
-  - updated_at (TIMESTAMP)
-""")
-
-        schema_parts.append("""
-Table: orders
-Columns:
-  - id (SERIAL PRIMARY KEY)
-  - customer_id (INT) - Foreign key to customers.id
-  - order_date (DATE) - Date of order
-  - total_amount (DECIMAL) - TOTAL ORDER PRICE (use this for revenue, NOT 'price'!)
-  - status (VARCHAR) - One of: 'Pending', 'Delivered', 'Cancelled', 'Processing'
-  - shipping_address (TEXT)
-  - created_at (TIMESTAMP)
-  - updated_at (TIMESTAMP)
-""")
-
-        # Golden examples
-        schema_parts.append("\nEXAMPLE QUERIES:")
-        schema_parts.append("-" * 60)
-
-        examples = [
-            ("How many customers do we have?", "SELECT COUNT(*) as customer_count FROM customers;"),
-            ("What is the total revenue from all orders?", "SELECT SUM(total_amount) as total_revenue FROM orders;"),
-            ("List all delivered orders", "SELECT * FROM orders WHERE status = 'Delivered' ORDER BY order_date DESC;"),
-            ("How many orders per customer segment?", "SELECT c.segment, COUNT(o.id) as order_count FROM customers c LEFT JOIN orders o ON c.id = o.customer_id GROUP BY c.segment;"),
-            ("Top 10 customers by total spending", "SELECT c.name, c.email, SUM(o.total_amount) as total_spent FROM customers c JOIN orders o ON c.id = o.customer_id GROUP BY c.id, c.name, c.email ORDER BY total_spent DESC LIMIT 10;"),
-        ]
-
-        for i, (question, sql) in enumerate(examples, 1):
-            schema_parts.append(f"\nExample {i}:")
-            schema_parts.append(f"Question: {question}")
-            schema_parts.append(f"SQL: {sql}")
-
-        return "\n".join(schema_parts)
-
     async def generate_sql_for_approval(self, question: str) -> Dict[str, Any]:
         """
         Generate SQL from a natural language question using Vanna 2.0 Agent.
@@ -386,31 +493,58 @@ Columns:
                 schema_context=self.schema_context
             )
 
-            # Create unique query ID for approval workflow
-            query_id = str(uuid.uuid4())
-
-            # Store pending query
-            self.pending_queries[query_id] = {
-                'question': question,
-                'sql': sql,
-                'status': 'pending_approval',
-                'generated_at': pd.Timestamp.now().isoformat()
-            }
-
-            return {
-                'query_id': query_id,
-                'question': question,
-                'sql': sql,
-                'explanation': "This SQL will retrieve data from your database. Please review before approving.",
-                'status': 'pending_approval'
-            }
+            return await self.create_pending_query(question, sql)
 
         except Exception as e:
             raise Exception(f"Failed to generate SQL: {str(e)}")
 
+    async def create_pending_query(
+        self,
+        question: str,
+        sql: str,
+        explanation: str = "This SQL will retrieve data from your database. Please review before approving."
+    ) -> Dict[str, Any]:
+        """
+        Register already-generated SQL for the approval workflow.
+        Used directly when SQL comes from the semantic cache, so every request
+        still gets its own query_id.
+
+        Args:
+            question: Natural language question
+            sql: SQL query awaiting approval
+            explanation: Explanation shown to the user
+
+        Returns:
+            Dictionary with query_id, question, SQL, and status
+        """
+        # Create short unique query ID for approval workflow (16 hex chars)
+        query_id = hashlib.blake2b(
+            f"{question}{time.time_ns()}".encode(), digest_size=8
+        ).hexdigest()
+        query_info = {
+            'question': question,
+            'sql': sql,
+            'status': 'pending_approval',
+            'generated_at': pd.Timestamp.now().isoformat()
+        }
+
+        # Store pending query (expires after PENDING_QUERY_TTL if never approved/rejected);
+        # fall back to a UUID if the short ID is already taken
+        if not await self.pending_queries.set(query_id, query_info):
+            query_id = str(uuid.uuid4())
+            await self.pending_queries.set(query_id, query_info)
+
+        return {
+            'query_id': query_id,
+            'question': question,
+            'sql': sql,
+            'explanation': explanation,
+            'status': 'pending_approval'
+        }
+
     async def execute_approved_query(self, query_id: str, approved: bool) -> Dict[str, Any]:
         """
-        Execute a SQL query after user approval using Vanna 2.0 Agent.
+        Execute a SQL query after user approval.
 
         Args:
             query_id: ID of the pending query
@@ -419,30 +553,27 @@ Columns:
         Returns:
             Dictionary with results or rejection message
         """
-        if query_id not in self.pending_queries:
+        # Claim the query first so concurrent approvals can't both execute it
+        query_info = await self.pending_queries.pop(query_id)
+
+        if query_info is None:
             return {
                 'error': 'Query ID not found',
                 'status': 'error'
             }
 
-        query_info = self.pending_queries[query_id]
-
         if not approved:
             # User rejected the query
-            del self.pending_queries[query_id]
             return {
                 'query_id': query_id,
                 'status': 'rejected',
                 'message': 'Query execution cancelled by user'
             }
 
-        # Execute the SQL using Vanna 2.0 Agent
+        # Execute the approved SQL directly against the database
         try:
             sql = query_info['sql']
-            results = await self.vanna.execute_sql_async(sql)
-
-            # Clean up pending query
-            del self.pending_queries[query_id]
+            results = await asyncio.to_thread(run_sql_on_engine, self.engine, sql)
 
             return {
                 'query_id': query_id,
@@ -454,23 +585,26 @@ Columns:
             }
 
         except Exception as e:
+            # Put the query back so the user can retry it
+            await self.pending_queries.set(query_id, query_info)
             return {
                 'query_id': query_id,
                 'error': str(e),
                 'status': 'error'
             }
 
-    def get_pending_queries(self) -> List[Dict[str, Any]]:
+    async def get_pending_queries(self) -> List[Dict[str, Any]]:
         """
         Get list of all pending queries awaiting approval.
 
         Returns:
             List of pending query information
         """
+        pending = await self.pending_queries.list_all()
         return [
             {
                 'query_id': qid,
                 **info
             }
-            for qid, info in self.pending_queries.items()
+            for qid, info in pending.items()
         ]
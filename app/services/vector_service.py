@@ -116,14 +116,18 @@ class VectorService:
                 # Create vector tuple: (id, values, metadata)
                 vectors_to_upsert.append((vector_id, embedding, metadata))
 
-            # Upsert vectors in batches
+            # Upsert vectors in batches, sent in parallel over gRPC (async_req returns futures)
             batch_size = 100
-            for i in range(0, len(vectors_to_upsert), batch_size):
-                batch = vectors_to_upsert[i:i + batch_size]
+            futures = [
                 self.index.upsert(
-                    vectors=batch,
-                    namespace=namespace
+                    vectors=vectors_to_upsert[i:i + batch_size],
+                    namespace=namespace,
+                    async_req=True
                 )
+                for i in range(0, len(vectors_to_upsert), batch_size)
+            ]
+            for future in futures:
+                future.result()  # Wait for completion and surface any errors
 
             logger.info(f"Successfully upserted {len(vectors_to_upsert)} vectors to Pinecone")
 
@@ -211,6 +215,27 @@ class VectorService:
         except Exception as e:
             raise Exception(f"Failed to get index stats: {str(e)}")
 
+    def delete_by_ids(self, ids: List[str], namespace: str = "default"):
+        """
+        Delete vectors by ID.
+
+        Args:
+            ids: Vector IDs to delete
+            namespace: Namespace containing the vectors
+        """
+        if not self.index:
+            self.connect_to_index()
+
+        try:
+            # Pinecone accepts at most 1000 IDs per delete request
+            batch_size = 1000
+            for i in range(0, len(ids), batch_size):
+                self.index.delete(ids=ids[i:i + batch_size], namespace=namespace)
+            logger.info(f"Deleted {len(ids)} vectors")
+
+        except Exception as e:
+            raise Exception(f"Failed to delete vectors: {str(e)}")
+
     def delete_by_filename(self, filename: str, namespace: str = "default"):
         """
         Delete all vectors associated with a filename.